@@ -1,4 +1,4 @@
-import glob
+import functools
 import hashlib
 import os
 import re
@@ -6,20 +6,37 @@ import shlex
 import stat
 import subprocess
 import sys
-import tarfile
 import tempfile
 import shutil
-import urllib.request
-import semver  # type: ignore[import-not-found]
-import yaml  # type: ignore[import-not-found]
+from typing import IO, TYPE_CHECKING
+
+# Heavier modules (semver, yaml, tarfile, urllib, http.client) are imported
+# where they are used to keep interpreter start-up cheap.
+if TYPE_CHECKING:
+    import http.client
+
+_HELM_DOWNLOAD_HOST = "get.helm.sh"
+_USER_AGENT = "package-helm-action"
+_SHA256_RE = re.compile(r"[0-9a-fA-F]{64}")
+_SAVED_RE = re.compile(r"saved it to:\s*(.+)\s*$", re.IGNORECASE | re.MULTILINE)
+# Map every values_files separator onto "\n" so a plain str.split suffices.
+_VALUES_FILES_SEPARATORS = str.maketrans(",\r", "\n\n")
+# Top-level chart files that `helm dependency update` may rewrite in place.
+_CHART_COPIED_FILES = frozenset(
+    {"Chart.yaml", "Chart.lock", "requirements.yaml", "requirements.lock"}
+)
 
 
 def eprint(*args: object) -> None:
     print(*args, file=sys.stderr)
 
 
+def _input_key(name: str) -> str:
+    return f"INPUT_{name.upper()}"
+
+
 def get_input(name: str, default: str | None = None, *, required: bool = False) -> str:
-    key = f"INPUT_{name.upper()}"
+    key = _input_key(name)
     val = os.environ.get(key)
     if val is None or val == "":
         if required and default is None:
@@ -40,6 +57,8 @@ def ensure_v_prefix(version: str) -> str:
 
 
 def validate_version(version: str) -> bool:
+    import semver  # type: ignore[import-not-found]
+
     try:
         semver.VersionInfo.parse(version.strip())
         return True
@@ -58,16 +77,86 @@ def detect_arch() -> str:
 
 
 def download(url: str, dest_path: str) -> None:
-    req = urllib.request.Request(url, headers={"User-Agent": "package-helm-action"})
+    import urllib.request
+
+    req = urllib.request.Request(url, headers={"User-Agent": _USER_AGENT})
     with urllib.request.urlopen(req) as resp, open(dest_path, "wb") as f:
-        f.write(resp.read())
+        shutil.copyfileobj(resp, f, length=1024 * 1024)
 
 
-def sha256_file(path: str) -> str:
+def download_and_hash(url: str, dest_path: str) -> str:
+    """
+    Download `url` to `dest_path` and return its sha256 hex digest.
+
+    Hashing while streaming avoids re-reading the file from disk afterwards.
+    """
+    import urllib.request
+
+    req = urllib.request.Request(url, headers={"User-Agent": _USER_AGENT})
+    with urllib.request.urlopen(req) as resp:
+        return _stream_to_file(resp, dest_path)
+
+
+def download_helm_release(filename: str, tar_path: str, sha_path: str) -> str:
+    """
+    Download a Helm release tarball and its `.sha256` file.
+
+    Both requests share a single HTTPS connection to get.helm.sh, saving a
+    TCP/TLS handshake. Returns the sha256 of the downloaded tarball.
+    """
+    import http.client
+    import urllib.request
+
+    url = f"https://{_HELM_DOWNLOAD_HOST}/{filename}"
+    if urllib.request.getproxies().get("https") and not urllib.request.proxy_bypass(
+        _HELM_DOWNLOAD_HOST
+    ):
+        # http.client does not honour proxy settings; let urllib handle them.
+        # These are separate connections, so fetch both files concurrently.
+        import concurrent.futures
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as ex:
+            tar_future = ex.submit(download_and_hash, url, tar_path)
+            sha_future = ex.submit(download, f"{url}.sha256", sha_path)
+            actual = tar_future.result()
+            sha_future.result()
+        return actual
+
+    conn = http.client.HTTPSConnection(_HELM_DOWNLOAD_HOST)
+    try:
+        actual = _get_to_file(conn, f"/{filename}", tar_path)
+        _get_to_file(conn, f"/{filename}.sha256", sha_path)
+    finally:
+        conn.close()
+    return actual
+
+
+def _get_to_file(conn: "http.client.HTTPConnection", path: str, dest_path: str) -> str:
+    import urllib.parse
+
+    url = f"https://{conn.host}{path}"
+    conn.request("GET", path, headers={"User-Agent": _USER_AGENT})
+    resp = conn.getresponse()
+    if resp.status == 200:
+        return _stream_to_file(resp, dest_path)
+
+    # Drain the body so the connection stays usable.
+    resp.read()
+    location = resp.getheader("Location")
+    if resp.status in {301, 302, 303, 307, 308} and location:
+        # http.client does not follow redirects; let urllib take it from here.
+        return download_and_hash(urllib.parse.urljoin(url, location), dest_path)
+    raise RuntimeError(
+        f"Download failed: GET {url} returned HTTP {resp.status} {resp.reason}"
+    )
+
+
+def _stream_to_file(resp: IO[bytes], dest_path: str) -> str:
     h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+    with open(dest_path, "wb") as f:
+        for chunk in iter(lambda: resp.read(1024 * 1024), b""):
             h.update(chunk)
+            f.write(chunk)
     return h.hexdigest()
 
 
@@ -80,7 +169,7 @@ def parse_sha256_file(path: str) -> str:
     if not txt:
         raise RuntimeError("Empty sha256 file")
     first_token = txt.split()[0].strip()
-    if not re.fullmatch(r"[0-9a-fA-F]{64}", first_token):
+    if not _SHA256_RE.fullmatch(first_token):
         raise RuntimeError(f"Invalid sha256 content: {txt[:120]}")
     return first_token.lower()
 
@@ -89,7 +178,9 @@ def run(cmd: list[str], *, cwd: str | None = None) -> subprocess.CompletedProces
     return subprocess.run(
         cmd,
         cwd=cwd,
-        text=True,
+        # Fixed codec: no locale lookup, and stray bytes can't crash decoding.
+        encoding="utf-8",
+        errors="replace",
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         check=False,
@@ -134,8 +225,9 @@ def parse_values_files(values_files_raw: str) -> list[str]:
     """
     Parse comma- and/or newline-separated file list.
     """
+    raw = (values_files_raw or "").translate(_VALUES_FILES_SEPARATORS)
     items: list[str] = []
-    for part in re.split(r"[,\n\r]+", values_files_raw or ""):
+    for part in raw.split("\n"):
         p = part.strip()
         if p:
             items.append(p)
@@ -161,22 +253,111 @@ def deep_merge_values(base: object, override: object) -> object:
     return override
 
 
+def _merge_into(base: object, override: object) -> object:
+    """
+    Same rules as `deep_merge_values`, but merges into `base` in place.
+
+    `base` must own its nested dicts, e.g. a tree built up from `{}` by this
+    function: dicts from `override` are copied once when inserted, so later
+    merges mutate only the merged tree and never a loaded document (YAML
+    aliases load as one shared dict). Existing dicts are merged into without
+    being copied, so each merge allocates only for newly inserted dicts.
+    """
+    if not (isinstance(base, dict) and isinstance(override, dict)):
+        return override
+    for k, v in override.items():
+        if isinstance(v, dict):
+            cur = base.get(k)
+            if not isinstance(cur, dict):
+                cur = base[k] = {}
+            _merge_into(cur, v)
+        else:
+            base[k] = v
+    return base
+
+
+def link_chart_tree(src_dir: str, dst_dir: str) -> None:
+    """
+    Mirror a chart directory using symlinks instead of copying file contents.
+
+    Directories are recreated and files are symlinked, so the cost does not
+    depend on chart size. The top-level `values.yaml` is skipped (the caller
+    writes the merged one) and files Helm may rewrite in place are copied so
+    the source chart is never modified through a link.
+
+    Helm follows the links when loading the chart but may log a "found
+    symbolic link in path" warning per linked file; that output ends up in
+    the captured stdout of `helm package` / `helm dependency update`.
+    """
+    stack = [(os.path.abspath(src_dir), os.path.abspath(dst_dir), True)]
+    while stack:
+        src, dst, top_level = stack.pop()
+        os.makedirs(dst)
+        with os.scandir(src) as it:
+            for entry in it:
+                target = os.path.join(dst, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, target, False))
+                elif top_level and entry.name == "values.yaml":
+                    continue
+                elif top_level and entry.name in _CHART_COPIED_FILES:
+                    shutil.copy2(entry.path, target)
+                else:
+                    # Relative links keep resolving when the workspace is
+                    # seen from the host runner rather than the container.
+                    os.symlink(os.path.relpath(entry.path, dst), target)
+
+
+@functools.cache
+def _yaml_safe_classes() -> tuple[type, type]:
+    """
+    Return the (Loader, Dumper) pair to use, preferring the LibYAML-backed
+    C implementation when PyYAML was built with it.
+    """
+    try:
+        from yaml import CSafeDumper, CSafeLoader  # type: ignore[import-not-found]
+
+        return CSafeLoader, CSafeDumper
+    except ImportError:
+        from yaml import SafeDumper, SafeLoader  # type: ignore[import-not-found]
+
+        return SafeLoader, SafeDumper
+
+
 def load_yaml_file(path: str) -> object:
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    import yaml  # type: ignore[import-not-found]
+
+    loader, _ = _yaml_safe_classes()
+    with open(path, "rb") as f:
+        data = yaml.load(f, Loader=loader)
     return {} if data is None else data
 
 
 def dump_yaml_file(path: str, data: object) -> None:
+    import yaml  # type: ignore[import-not-found]
+
+    _, dumper = _yaml_safe_classes()
     with open(path, "w", encoding="utf-8") as f:
-        yaml.safe_dump(
+        yaml.dump(
             data,
             f,
+            Dumper=dumper,
             default_flow_style=False,
             sort_keys=False,
         )
 
 
+def newest_tgz(directory: str) -> str | None:
+    """
+    Return the most recently modified `*.tgz` file in `directory`, if any.
+    """
+    with os.scandir(directory) as it:
+        entries = [e for e in it if e.name.endswith(".tgz") and e.is_file()]
+    if not entries:
+        return None
+    return max(entries, key=lambda e: e.stat().st_mtime).path
+
+
 def build_helm_package_cmd(
     *,
     chart_path: str,
@@ -185,7 +366,8 @@ def build_helm_package_cmd(
     helm_chart_app_version: str,
     package_args: str,
 ) -> list[str]:
-    cmd = [
+    extra = shlex.split(package_args) if package_args and not package_args.isspace() else []
+    return [
         "helm",
         "package",
         chart_path,
@@ -195,10 +377,41 @@ def build_helm_package_cmd(
         helm_chart_version,
         "--app-version",
         helm_chart_app_version,
+        *extra,
     ]
-    extra = shlex.split(package_args) if package_args.strip() else []
-    cmd.extend(extra)
-    return cmd
+
+
+def extract_tar_member(tar_path: str, member_path: str, dest_dir: str) -> str:
+    """
+    Extract a single member of a .tar.gz archive into `dest_dir`.
+
+    Uses the system `tar` when available (much faster than Python's tarfile
+    for gzip decompression) and falls back to tarfile otherwise.
+    """
+    if shutil.which("tar") is not None:
+        # As root, tar would otherwise restore the archive's uid/gid.
+        res = run(["tar", "--no-same-owner", "-xzf", tar_path, "-C", dest_dir, member_path])
+        if res.returncode != 0:
+            raise RuntimeError(f"Failed to extract {member_path} from {tar_path}:\n{res.stdout}")
+    else:
+        import tarfile
+
+        # Stream mode: stop at the first match instead of indexing every member.
+        with tarfile.open(tar_path, "r|gz") as tf:
+            for member in tf:
+                if member.name == member_path:
+                    # Same as tar --no-same-owner: own the file as the current user.
+                    member.uid, member.gid = os.geteuid(), os.getegid()
+                    member.uname = member.gname = ""
+                    tf.extract(member, path=dest_dir)
+                    break
+            else:
+                raise RuntimeError(f"Helm archive missing {member_path}")
+
+    extracted = os.path.join(dest_dir, member_path)
+    if not os.path.isfile(extracted):
+        raise RuntimeError(f"Helm archive missing {member_path}")
+    return extracted
 
 
 def install_helm(helm_version: str) -> None:
@@ -207,19 +420,16 @@ def install_helm(helm_version: str) -> None:
     platform = "linux"
 
     filename = f"helm-{version}-{platform}-{arch}.tar.gz"
-    url = f"https://get.helm.sh/{filename}"
-    sha_url = f"{url}.sha256"
+    url = f"https://{_HELM_DOWNLOAD_HOST}/{filename}"
 
     with tempfile.TemporaryDirectory(prefix="helm-install-") as td:
         tar_path = os.path.join(td, filename)
         sha_path = tar_path + ".sha256"
 
         eprint(f"Downloading Helm {version} ({platform}/{arch})...")
-        download(url, tar_path)
-        download(sha_url, sha_path)
+        actual = download_helm_release(filename, tar_path, sha_path)
 
         expected = parse_sha256_file(sha_path)
-        actual = sha256_file(tar_path)
         if actual != expected:
             raise RuntimeError(
                 "Helm tarball sha256 mismatch. "
@@ -227,18 +437,12 @@ def install_helm(helm_version: str) -> None:
             )
 
         eprint("Extracting Helm...")
-        with tarfile.open(tar_path, "r:gz") as tf:
-            member_path = f"{platform}-{arch}/helm"
-            try:
-                member = tf.getmember(member_path)
-            except KeyError as ex:
-                raise RuntimeError(f"Helm archive missing {member_path}") from ex
-            tf.extract(member, path=td)
-            helm_src = os.path.join(td, member_path)
+        helm_src = extract_tar_member(tar_path, f"{platform}-{arch}/helm", td)
 
         helm_dst = "/usr/local/bin/helm"
-        with open(helm_src, "rb") as src, open(helm_dst, "wb") as dst:
-            dst.write(src.read())
+        # A rename when possible; across filesystems shutil falls back to
+        # copyfile, which uses os.sendfile on Linux (no user-space buffer).
+        shutil.move(helm_src, helm_dst)
         os.chmod(helm_dst, 0o755)
 
     ver = run(["helm", "version", "--short"])
@@ -251,15 +455,28 @@ def main() -> int:
     try:
         workspace = os.environ.get("GITHUB_WORKSPACE", "/github/workspace")
 
-        chart_path_in = get_input("chart_path", required=True)
+        chart_path_in = get_input("chart_path")
         destination_in = get_input("destination", default=".")
         helm_version = get_input("helm_version", default="v3.14.4")
         dependency_update = truthy(get_input("dependency_update", default="false"))
         package_args_in = get_input("package_args", default="")
-        helm_chart_version = get_input("helm_chart_version", required=True)
-        helm_chart_app_version = get_input("helm_chart_app_version", required=True)
+        helm_chart_version = get_input("helm_chart_version")
+        helm_chart_app_version = get_input("helm_chart_app_version")
         values_files_raw = get_input("values_files", default="")
 
+        # Check required inputs together so every missing one is reported.
+        missing = [
+            f"{name} (env {_input_key(name)})"
+            for name, val in (
+                ("chart_path", chart_path_in),
+                ("helm_chart_version", helm_chart_version),
+                ("helm_chart_app_version", helm_chart_app_version),
+            )
+            if not val
+        ]
+        if missing:
+            raise ValueError(f"Missing required input: {', '.join(missing)}")
+
         if not validate_version(helm_chart_version):
             raise RuntimeError(f"Invalid helm chart version (SemVer required): {helm_chart_version}")
 
@@ -278,17 +495,23 @@ def main() -> int:
         chart_path_for_packaging = chart_path
         if values_files:
             eprint(f"Merging values files: {', '.join(values_files)}")
-            merged_values: object = {}
-            for rel in values_files:
-                src_path = os.path.normpath(os.path.join(chart_path, rel))
+            src_paths = [resolve_path(chart_path, rel) for rel in values_files]
+            # Fail fast on a missing file before spending time parsing YAML.
+            for src_path in src_paths:
                 if not os.path.isfile(src_path):
                     raise RuntimeError(f"Values file not found: {src_path}")
-                merged_values = deep_merge_values(merged_values, load_yaml_file(src_path))
+            docs = [load_yaml_file(src_path) for src_path in src_paths]
+            merged_values = functools.reduce(_merge_into, docs, {})
 
             tmp_root = tempfile.mkdtemp(prefix=".dist-temporary-", dir=workspace)
             chart_name = os.path.basename(os.path.normpath(chart_path))
             tmp_chart = os.path.join(tmp_root, chart_name)
-            shutil.copytree(chart_path, tmp_chart)
+            try:
+                link_chart_tree(chart_path, tmp_chart)
+            except OSError:
+                # e.g. symlinks unsupported (Windows without privileges).
+                shutil.rmtree(tmp_chart, ignore_errors=True)
+                shutil.copytree(chart_path, tmp_chart)
 
             dump_yaml_file(os.path.join(tmp_chart, "values.yaml"), merged_values)
             chart_path_for_packaging = tmp_chart
@@ -313,16 +536,13 @@ def main() -> int:
             raise RuntimeError(f"`helm package` failed:\n{res.stdout}")
 
         out = res.stdout
-        m = re.search(r"saved it to:\s*(.+)\s*$", out, flags=re.IGNORECASE | re.MULTILINE)
+        m = _SAVED_RE.search(out)
         package_path = None
         if m:
             package_path = m.group(1).strip()
         else:
             # Fallback: pick the newest tgz in destination.
-            tgzs = glob.glob(os.path.join(destination, "*.tgz"))
-            if tgzs:
-                tgzs.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-                package_path = tgzs[0]
+            package_path = newest_tgz(destination)
 
         if not package_path:
             raise RuntimeError(
@@ -1,7 +1,12 @@
+import hashlib
+import io
 import os
 import sys
+import tarfile
 from pathlib import Path
 
+import pytest
+
 REPO_ROOT = str(Path(__file__).resolve().parents[1])
 if REPO_ROOT not in sys.path:
     sys.path.insert(0, REPO_ROOT)
@@ -9,6 +14,18 @@ if REPO_ROOT not in sys.path:
 import entrypoint
 
 
+def test_get_input(monkeypatch):
+    monkeypatch.setenv("INPUT_CHART_PATH", "charts/app")
+    monkeypatch.setenv("INPUT_DESTINATION", "")
+    monkeypatch.delenv("INPUT_PACKAGE_ARGS", raising=False)
+    monkeypatch.delenv("INPUT_HELM_CHART_VERSION", raising=False)
+    assert entrypoint.get_input("chart_path") == "charts/app"
+    assert entrypoint.get_input("destination", default=".") == "."
+    assert entrypoint.get_input("package_args") == ""
+    with pytest.raises(ValueError, match=r"helm_chart_version \(env INPUT_HELM_CHART_VERSION\)"):
+        entrypoint.get_input("helm_chart_version", required=True)
+
+
 def test_truthy():
     assert entrypoint.truthy("true") is True
     assert entrypoint.truthy("TRUE") is True
@@ -87,6 +104,18 @@ def test_build_helm_package_cmd_includes_versions_and_args():
     assert "--debug" in cmd
 
 
+def test_build_helm_package_cmd_blank_args():
+    for package_args in ("", "  \n"):
+        cmd = entrypoint.build_helm_package_cmd(
+            chart_path="/ws/chart",
+            destination="/ws/dist",
+            helm_chart_version="1.2.3",
+            helm_chart_app_version="4.5.6",
+            package_args=package_args,
+        )
+        assert cmd[-2:] == ["--app-version", "4.5.6"]
+
+
 def test_parse_values_files():
     assert entrypoint.parse_values_files("") == []
     assert entrypoint.parse_values_files("values.yaml") == ["values.yaml"]
@@ -98,6 +127,7 @@ def test_parse_values_files():
         "values.yaml",
         "values.dev.yaml",
     ]
+    assert entrypoint.parse_values_files(" a.yaml ,\r\n, b.yaml\r\n") == ["a.yaml", "b.yaml"]
 
 
 def test_deep_merge_values_dict_merge_and_list_replace():
@@ -110,4 +140,391 @@ def test_deep_merge_values_dict_merge_and_list_replace():
         "nested": {"x": 9, "y": 2, "keep": "k"},
         "lst": [3],
     }
+    assert base == {"a": 1, "nested": {"x": 1, "keep": "k"}, "lst": [1, 2]}
+
+
+def test_merge_into_merges_in_place_without_touching_overrides():
+    first = {"nested": {"x": 1}}
+    second = {"nested": {"y": 2}}
+    base: dict = {}
+    entrypoint._merge_into(base, first)
+    nested = base["nested"]
+    assert nested is not first["nested"]
+
+    merged = entrypoint._merge_into(base, second)
+    assert merged is base
+    assert base["nested"] is nested
+    assert base == {"nested": {"x": 1, "y": 2}}
+    assert first == {"nested": {"x": 1}}
+    assert second == {"nested": {"y": 2}}
+    assert entrypoint._merge_into(base, ["replaced"]) == ["replaced"]
+
+
+def test_deep_merge_values_does_not_leak_into_yaml_aliases(tmp_path):
+    a = tmp_path / "a.yaml"
+    a.write_text("base: &b {p: 1}\nother: *b\n", encoding="utf-8")
+    b = tmp_path / "b.yaml"
+    b.write_text("base: {p: 2}\n", encoding="utf-8")
+    merged = entrypoint.deep_merge_values(
+        entrypoint.load_yaml_file(str(a)), entrypoint.load_yaml_file(str(b))
+    )
+    assert merged == {"base": {"p": 2}, "other": {"p": 1}}
+
+
+def test_yaml_roundtrip_preserves_key_order(tmp_path):
+    p = tmp_path / "values.yaml"
+    data = {"z": 1, "a": {"nested": [1, "two"]}, "m": None}
+    entrypoint.dump_yaml_file(str(p), data)
+    assert list(entrypoint.load_yaml_file(str(p))) == ["z", "a", "m"]
+    assert entrypoint.load_yaml_file(str(p)) == data
+
+
+def test_load_yaml_file_empty_returns_dict(tmp_path):
+    p = tmp_path / "values.yaml"
+    p.write_text("", encoding="utf-8")
+    assert entrypoint.load_yaml_file(str(p)) == {}
+
+
+def test_download_streams_to_file(tmp_path):
+    src = tmp_path / "src.bin"
+    data = os.urandom(3 * 1024 * 1024 + 7)
+    src.write_bytes(data)
+    dest = tmp_path / "dest.bin"
+    entrypoint.download(src.as_uri(), str(dest))
+    assert dest.read_bytes() == data
+
+
+def test_download_and_hash(tmp_path):
+    src = tmp_path / "src.bin"
+    data = os.urandom(2 * 1024 * 1024 + 3)
+    src.write_bytes(data)
+    dest = tmp_path / "dest.bin"
+    digest = entrypoint.download_and_hash(src.as_uri(), str(dest))
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert dest.read_bytes() == data
+
+
+def _make_helm_tarball(tmp_path):
+    payload = tmp_path / "helm"
+    payload.write_bytes(b"#!/bin/sh\necho helm\n")
+    tar_path = tmp_path / "helm.tar.gz"
+    with tarfile.open(tar_path, "w:gz") as tf:
+        tf.add(payload, arcname="linux-amd64/README.md")
+        tf.add(payload, arcname="linux-amd64/helm")
+    return tar_path
+
+
+@pytest.mark.parametrize("system_tar", [True, False])
+def test_extract_tar_member(tmp_path, monkeypatch, system_tar):
+    tar_path = _make_helm_tarball(tmp_path)
+    if not system_tar:
+        monkeypatch.setattr(entrypoint.shutil, "which", lambda name: None)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    extracted = entrypoint.extract_tar_member(str(tar_path), "linux-amd64/helm", str(out_dir))
+    assert extracted == str(out_dir / "linux-amd64" / "helm")
+    assert Path(extracted).read_bytes() == b"#!/bin/sh\necho helm\n"
+
+
+def test_extract_tar_member_missing_with_system_tar(tmp_path):
+    tar_path = _make_helm_tarball(tmp_path)
+    with pytest.raises(RuntimeError, match="Failed to extract linux-arm64/helm from "):
+        entrypoint.extract_tar_member(str(tar_path), "linux-arm64/helm", str(tmp_path))
+
+
+def test_extract_tar_member_missing_with_tarfile(tmp_path, monkeypatch):
+    tar_path = _make_helm_tarball(tmp_path)
+    monkeypatch.setattr(entrypoint.shutil, "which", lambda name: None)
+    with pytest.raises(RuntimeError, match="Helm archive missing linux-arm64/helm"):
+        entrypoint.extract_tar_member(str(tar_path), "linux-arm64/helm", str(tmp_path))
+
+
+def test_extract_tar_member_corrupt_archive(tmp_path):
+    tar_path = tmp_path / "helm.tar.gz"
+    tar_path.write_bytes(b"not a gzip stream")
+    with pytest.raises(RuntimeError, match="Failed to extract linux-amd64/helm from "):
+        entrypoint.extract_tar_member(str(tar_path), "linux-amd64/helm", str(tmp_path))
+
+
+@pytest.mark.parametrize("system_tar", [True, False])
+def test_extract_tar_member_ignores_archive_owner(tmp_path, monkeypatch, system_tar):
+    payload = tmp_path / "helm"
+    payload.write_bytes(b"bin")
+    tar_path = tmp_path / "helm.tar.gz"
+    with tarfile.open(tar_path, "w:gz") as tf:
+        info = tf.gettarinfo(str(payload), arcname="linux-amd64/helm")
+        info.uid = info.gid = 4242
+        info.uname = info.gname = "builder"
+        with open(payload, "rb") as f:
+            tf.addfile(info, f)
+    if not system_tar:
+        monkeypatch.setattr(entrypoint.shutil, "which", lambda name: None)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    extracted = entrypoint.extract_tar_member(str(tar_path), "linux-amd64/helm", str(out_dir))
+    st = os.stat(extracted)
+    assert (st.st_uid, st.st_gid) == (os.geteuid(), os.getegid())
+
+
+def test_link_chart_tree(tmp_path):
+    src = tmp_path / "chart"
+    (src / "templates").mkdir(parents=True)
+    (src / "Chart.yaml").write_text("name: demo\n", encoding="utf-8")
+    (src / "values.yaml").write_text("a: 1\n", encoding="utf-8")
+    (src / "templates" / "cm.yaml").write_text("kind: ConfigMap\n", encoding="utf-8")
+    (src / "templates" / "values.yaml").write_text("nested: true\n", encoding="utf-8")
+
+    dst = tmp_path / "out" / "chart"
+    entrypoint.link_chart_tree(str(src), str(dst))
+
+    assert not (dst / "values.yaml").exists()
+    assert (dst / "Chart.yaml").is_file() and not (dst / "Chart.yaml").is_symlink()
+    assert (dst / "templates").is_dir() and not (dst / "templates").is_symlink()
+    assert (dst / "templates" / "cm.yaml").is_symlink()
+    assert (dst / "templates" / "cm.yaml").read_text(encoding="utf-8") == "kind: ConfigMap\n"
+    assert (dst / "templates" / "values.yaml").is_symlink()
+
+
+def test_link_chart_tree_links_survive_moving_the_workspace(tmp_path):
+    ws = tmp_path / "container-ws"
+    src = ws / "chart"
+    (src / "templates").mkdir(parents=True)
+    (src / "Chart.yaml").write_text("name: demo\n", encoding="utf-8")
+    (src / "templates" / "cm.yaml").write_text("kind: ConfigMap\n", encoding="utf-8")
+    entrypoint.link_chart_tree(str(src), str(ws / ".dist-temporary-x" / "chart"))
+
+    # Simulate the host runner seeing the workspace at a different path.
+    host_ws = tmp_path / "host-ws"
+    ws.rename(host_ws)
+    link = host_ws / ".dist-temporary-x" / "chart" / "templates" / "cm.yaml"
+    assert link.is_symlink()
+    assert not os.path.isabs(os.readlink(link))
+    assert link.read_text(encoding="utf-8") == "kind: ConfigMap\n"
+
+
+def test_main_reports_all_missing_required_inputs(monkeypatch, capsys):
+    for key in ("INPUT_CHART_PATH", "INPUT_HELM_CHART_VERSION", "INPUT_HELM_CHART_APP_VERSION"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("INPUT_HELM_CHART_VERSION", "1.2.3")
+    assert entrypoint.main() == 1
+    err = capsys.readouterr().err
+    assert "chart_path (env INPUT_CHART_PATH)" in err
+    assert "helm_chart_app_version (env INPUT_HELM_CHART_APP_VERSION)" in err
+    assert "INPUT_HELM_CHART_VERSION" not in err
+
+
+def test_newest_tgz(tmp_path):
+    assert entrypoint.newest_tgz(str(tmp_path)) is None
+    old = tmp_path / "chart-1.0.0.tgz"
+    new = tmp_path / "chart-1.1.0.tgz"
+    old.write_bytes(b"old")
+    new.write_bytes(b"new")
+    (tmp_path / "notes.txt").write_text("x", encoding="utf-8")
+    (tmp_path / "dir.tgz").mkdir()
+    os.utime(old, (1_000, 1_000))
+    os.utime(new, (2_000, 2_000))
+    assert entrypoint.newest_tgz(str(tmp_path)) == str(new)
+
+
+class _FakeResponse(io.BytesIO):
+    def __init__(self, status, body, headers=None):
+        super().__init__(body)
+        self.status = status
+        self.reason = "OK" if status == 200 else "Not Found"
+        self.headers = headers or {}
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+
+class _FakeConnection:
+    host = "get.helm.sh"
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+        self.closed = False
+
+    def request(self, method, path, headers=None):
+        self.requested.append((method, path))
+
+    def getresponse(self):
+        return self.responses.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+def test_download_helm_release_reuses_connection(tmp_path, monkeypatch):
+    tarball = b"tarball-bytes"
+    conn = _FakeConnection([_FakeResponse(200, tarball), _FakeResponse(200, b"a" * 64)])
+    monkeypatch.setattr("http.client.HTTPSConnection", lambda host: conn)
+    monkeypatch.setattr("urllib.request.getproxies", lambda: {})
+    tar_path = tmp_path / "helm.tar.gz"
+    sha_path = tmp_path / "helm.tar.gz.sha256"
+
+    digest = entrypoint.download_helm_release("helm.tar.gz", str(tar_path), str(sha_path))
+
+    assert digest == hashlib.sha256(tarball).hexdigest()
+    assert conn.requested == [("GET", "/helm.tar.gz"), ("GET", "/helm.tar.gz.sha256")]
+    assert conn.closed
+    assert tar_path.read_bytes() == tarball
+    assert sha_path.read_bytes() == b"a" * 64
+
+
+def test_download_helm_release_follows_redirect(tmp_path, monkeypatch):
+    tarball = b"redirected-tarball"
+    conn = _FakeConnection(
+        [
+            _FakeResponse(302, b"", {"Location": "/cdn/helm.tar.gz"}),
+            _FakeResponse(200, b"a" * 64),
+        ]
+    )
+    fetched = []
+
+    def fake_download_and_hash(url, dest_path):
+        fetched.append(url)
+        Path(dest_path).write_bytes(tarball)
+        return hashlib.sha256(tarball).hexdigest()
+
+    monkeypatch.setattr("http.client.HTTPSConnection", lambda host: conn)
+    monkeypatch.setattr("urllib.request.getproxies", lambda: {})
+    monkeypatch.setattr(entrypoint, "download_and_hash", fake_download_and_hash)
+    tar_path = tmp_path / "helm.tar.gz"
+    sha_path = tmp_path / "helm.tar.gz.sha256"
+
+    digest = entrypoint.download_helm_release("helm.tar.gz", str(tar_path), str(sha_path))
+
+    assert digest == hashlib.sha256(tarball).hexdigest()
+    assert fetched == ["https://get.helm.sh/cdn/helm.tar.gz"]
+    assert conn.requested == [("GET", "/helm.tar.gz"), ("GET", "/helm.tar.gz.sha256")]
+    assert tar_path.read_bytes() == tarball
+    assert sha_path.read_bytes() == b"a" * 64
+
+
+def test_download_helm_release_http_error(tmp_path, monkeypatch):
+    conn = _FakeConnection([_FakeResponse(404, b"missing")])
+    monkeypatch.setattr("http.client.HTTPSConnection", lambda host: conn)
+    monkeypatch.setattr("urllib.request.getproxies", lambda: {})
+    with pytest.raises(RuntimeError, match="HTTP 404"):
+        entrypoint.download_helm_release(
+            "helm.tar.gz", str(tmp_path / "a"), str(tmp_path / "b")
+        )
+    assert conn.closed
+
+
+def test_load_yaml_file_decodes_utf8_bytes(tmp_path):
+    p = tmp_path / "values.yaml"
+    p.write_bytes("﻿greeting: héllo wörld\n".encode("utf-8"))
+    assert entrypoint.load_yaml_file(str(p)) == {"greeting": "héllo wörld"}
+
+
+def test_dump_yaml_file_writes_utf8(tmp_path):
+    p = tmp_path / "values.yaml"
+    entrypoint.dump_yaml_file(str(p), {"greeting": "héllo"})
+    assert entrypoint.load_yaml_file(str(p)) == {"greeting": "héllo"}
+
+
+def test_run_decodes_output_as_utf8_with_replacement():
+    res = entrypoint.run(
+        [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'ok \\xc3\\xa9 \\xff')"]
+    )
+    assert res.returncode == 0
+    assert res.stdout == "ok \u00e9 \ufffd"
+
+
+def test_download_helm_release_via_proxy_uses_urllib(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_download_and_hash(url, dest_path):
+        calls.append(("tar", url))
+        return "digest"
+
+    def fake_download(url, dest_path):
+        calls.append(("sha", url))
+
+    monkeypatch.setattr("urllib.request.getproxies", lambda: {"https": "http://proxy:3128"})
+    monkeypatch.setattr("urllib.request.proxy_bypass", lambda host: False)
+    monkeypatch.setattr(entrypoint, "download_and_hash", fake_download_and_hash)
+    monkeypatch.setattr(entrypoint, "download", fake_download)
+
+    digest = entrypoint.download_helm_release("helm.tar.gz", str(tmp_path / "a"), str(tmp_path / "b"))
+
+    assert digest == "digest"
+    assert sorted(calls) == [
+        ("sha", "https://get.helm.sh/helm.tar.gz.sha256"),
+        ("tar", "https://get.helm.sh/helm.tar.gz"),
+    ]
+
+
+def test_import_defers_heavy_modules():
+    code = (
+        "import sys, entrypoint; "
+        "print(sorted(m for m in ('semver', 'yaml', 'tarfile', 'urllib.request') if m in sys.modules))"
+    )
+    res = entrypoint.run([sys.executable, "-c", code], cwd=REPO_ROOT)
+    assert res.returncode == 0, res.stdout
+    assert res.stdout.strip() == "[]"
+
+
+def _run_main_packaging(tmp_path, monkeypatch, values_files):
+    """
+    Run main() with Helm stubbed out; return (exit code, packaged chart dir,
+    merged values as seen by `helm package`).
+    """
+    workspace = tmp_path / "ws"
+    chart = workspace / "chart"
+    (chart / "templates").mkdir(parents=True)
+    (chart / "Chart.yaml").write_text("apiVersion: v2\nname: demo\nversion: 0.1.0\n", encoding="utf-8")
+    (chart / "templates" / "cm.yaml").write_text("kind: ConfigMap\n", encoding="utf-8")
+    for name, content in values_files.items():
+        (chart / name).write_text(content, encoding="utf-8")
+
+    for key, val in {
+        "GITHUB_WORKSPACE": str(workspace),
+        "GITHUB_OUTPUT": str(tmp_path / "output"),
+        "INPUT_CHART_PATH": "chart",
+        "INPUT_DESTINATION": "dist",
+        "INPUT_HELM_CHART_VERSION": "1.2.3",
+        "INPUT_HELM_CHART_APP_VERSION": "1.2.3",
+        "INPUT_VALUES_FILES": ",".join(values_files),
+    }.items():
+        monkeypatch.setenv(key, val)
+    monkeypatch.setattr(entrypoint, "install_helm", lambda helm_version: None)
+
+    packaged = {}
+
+    def fake_run(cmd, *, cwd=None):
+        assert cmd[:2] == ["helm", "package"]
+        packaged["chart"] = Path(cmd[2])
+        packaged["values"] = entrypoint.load_yaml_file(str(Path(cmd[2]) / "values.yaml"))
+        out = f"Successfully packaged chart and saved it to: {workspace}/dist/demo-1.2.3.tgz\n"
+        return entrypoint.subprocess.CompletedProcess(cmd, 0, stdout=out)
+
+    monkeypatch.setattr(entrypoint, "run", fake_run)
+    rc = entrypoint.main()
+    return rc, packaged.get("chart"), packaged.get("values")
+
+
+def test_main_merges_values_files_with_yaml_aliases(tmp_path, monkeypatch):
+    rc, _, values = _run_main_packaging(
+        tmp_path,
+        monkeypatch,
+        {"a.yaml": "base: &b {p: 1}\nother: *b\n", "b.yaml": "base: {p: 2}\n"},
+    )
+    assert rc == 0
+    assert values == {"base": {"p": 2}, "other": {"p": 1}}
+    assert (tmp_path / "output").read_text(encoding="utf-8") == "package_path=dist/demo-1.2.3.tgz\n"
+
+
+def test_main_falls_back_to_copytree_without_symlinks(tmp_path, monkeypatch):
+    def no_symlink(src, dst, *args, **kwargs):
+        raise OSError("symlinks not supported")
 
+    monkeypatch.setattr(entrypoint.os, "symlink", no_symlink)
+    rc, chart, values = _run_main_packaging(tmp_path, monkeypatch, {"values.yaml": "a: 1\n"})
+    assert rc == 0
+    assert values == {"a": 1}
+    cm = chart / "templates" / "cm.yaml"
+    assert cm.is_file() and not cm.is_symlink()
+    assert cm.read_text(encoding="utf-8") == "kind: ConfigMap\n"